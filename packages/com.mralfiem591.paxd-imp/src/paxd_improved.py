@@ -4,13 +4,15 @@ PaxD Improved - Modern Package Manager with Rich UI
 Enhanced version of PaxD with beautiful command line interface using Rich
 """
 
-__name__ = "PaxD Improved"
+__title__ = "PaxD Improved"
 __author__ = "mralfiem591"
 __license__ = "MIT"
 __version__ = "1.0.0"
 
 import os
+import re
 import sys
+import csv
 import json
 import requests
 import yaml
@@ -19,9 +21,14 @@ import shutil
 import stat
 import hashlib
 import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from functools import cached_property
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Rich imports for beautiful UI
 from rich.console import Console
@@ -37,11 +44,47 @@ from rich.layout import Layout
 from rich.padding import Padding
 import time
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    # orjson not available, fall back to the standard library parser
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    # libyaml not available, fall back to the pure-Python loader
+    from yaml import SafeLoader as _YamlLoader
+
+def _yaml_load(data):
+    """Safely load YAML using the libyaml C loader when available"""
+    return yaml.load(data, Loader=_YamlLoader)
+
+def _write_small_file(path, data: bytes):
+    """Write a tiny file with unbuffered writes, bypassing the io stack"""
+    # O_BINARY keeps Windows from translating newlines, so the bytes land exactly as given
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 # Initialize Rich console
 console = Console()
 
-console.print(f"[bold red]CRITICAL WARNING:[/bold red] [yellow]PaxD Improved is a BETA version of PaxD, which will eventually become the default client. [bold yellow]A LOT OF STUFF IS BROKEN! DO NOT EXPECT STABILITY![/bold yellow][/yellow]\n\n[blue]You can switch back to the default client via [cyan]paxd switchback[/cyan][blue] if you encounter issues.[/blue]\n[green]Please report any bugs you find!\n\nYou may continue after 5 seconds.[/green]")
-time.sleep(5)
+# Matches a JSON string literal (kept as-is) or a // line comment (dropped)
+_JSONC_RE = re.compile(rb'("(?:\\.|[^"\\])*")|//[^\n]*')
+
+# Bump when _compile_paxd_manifest changes shape, so cached manifests are recompiled
+_MANIFEST_CACHE_FORMAT = 1
+
+# Lowercases ASCII letters in raw bytes, for case-insensitive scanning without decoding
+_ASCII_LOWER = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
 
 class PaxDImproved:
     """Improved PaxD package manager with Rich UI"""
@@ -53,9 +96,26 @@ class PaxDImproved:
         self.repository_file = os.path.join(os.path.dirname(__file__), "repository")
         self.local_app_data = os.path.join(os.path.expandvars(r"%LOCALAPPDATA%"), "PaxD")
         self.headers = {'User-Agent': 'PaxD-Improved/1.0.0'}
+        self.download_workers = 8
+        
+        # Shared session so connections are pooled and kept alive between requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Retry transient server errors too, then hand the last response back for raise_for_status
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(16, self.download_workers), max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._meta_cache: Dict[Tuple[str, str], Tuple[dict, str]] = {}
+        # Kept outside the PaxD directory, where every subdirectory is treated as an installed package
+        self.cache_dir = os.path.join(os.path.dirname(self.local_app_data), "PaxD-Improved", "cache")
         
         # Ensure PaxD directory exists
         os.makedirs(self.local_app_data, exist_ok=True)
+        
+        # Batch files for installed packages all launch through the original PaxD's run_pkg.py
+        self._run_pkg_path = os.path.join(self.local_app_data, "com.mralfiem591.paxd", "run_pkg.py")
+        self._bat_prefix = f'@echo off\r\n"{sys.executable}" "{self._run_pkg_path}" '
     
     def log_verbose(self, message: str):
         """Log verbose messages if verbose mode is enabled"""
@@ -94,7 +154,12 @@ class PaxDImproved:
             return repo_url[11:]  # Remove optimised:: prefix
         return repo_url
     
-    def _fetch_with_progress(self, url: str, description: str) -> requests.Response:
+    @cached_property
+    def repo_url(self) -> str:
+        """Resolved repository URL, read from the repository file once per instance"""
+        return self._resolve_repository_url(self._read_repository_url())
+    
+    def _fetch_with_progress(self, url: str, description: str, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> requests.Response:
         """Fetch URL with a progress spinner"""
         with Progress(
             SpinnerColumn(),
@@ -104,70 +169,104 @@ class PaxDImproved:
         ) as progress:
             task = progress.add_task(description, total=None)
             try:
-                response = requests.get(url, headers=self.headers, allow_redirects=True)
+                response = self.session.get(url, headers=headers, allow_redirects=True, stream=stream)
                 response.raise_for_status()
                 return response
             except Exception as e:
                 console.print(f"[red]Failed to fetch {url}: {e}[/red]")
                 raise
     
-    def _parse_jsonc(self, jsonc_text: str) -> dict:
-        """Parse JSONC (JSON with comments) by removing comments"""
-        lines = jsonc_text.split('\n')
-        cleaned_lines = []
+    def _parse_jsonc(self, jsonc_data: bytes) -> dict:
+        """Parse JSONC (JSON with comments) by removing comments, working on the raw bytes"""
+        cleaned_json = _JSONC_RE.sub(lambda m: m.group(1) or b'', jsonc_data)
+        return _json_loads(cleaned_json)
+    
+    def _fetch_manifest(self, url: str, package_name: str, parse) -> dict:
+        """Fetch and parse a manifest, reusing the on-disk cache when it is unchanged"""
+        cache_file = os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+        cached = None
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = _json_loads(f.read())
+            # Entries from another client version or cache format may hold a differently compiled manifest
+            if cached.get("client") != __version__ or cached.get("format") != _MANIFEST_CACHE_FORMAT:
+                cached = None
+        except (OSError, ValueError, AttributeError):
+            cached = None
         
-        for line in lines:
-            # Find // that's not inside a string
-            in_string = False
-            escaped = False
-            comment_pos = None
-            
-            for i, char in enumerate(line):
-                if escaped:
-                    escaped = False
-                    continue
-                if char == '\\':
-                    escaped = True
-                elif char == '"' and not escaped:
-                    in_string = not in_string
-                elif not in_string and char == '/' and i + 1 < len(line) and line[i + 1] == '/':
-                    comment_pos = i
-                    break
-            
-            if comment_pos is not None:
-                cleaned_lines.append(line[:comment_pos].rstrip())
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        
+        response = self._fetch_with_progress(url, f"Fetching {package_name} metadata...", headers)
+        if cached and response.status_code == 304:
+            self.log_verbose(f"Manifest not modified, using cache: {url}")
+            return cached["manifest"]
+        
+        # Only re-parse if the manifest content actually changed
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        etag = response.headers.get("ETag")
+        if cached and cached.get("sha256") == content_hash:
+            self.log_verbose(f"Manifest content unchanged, using cache: {url}")
+            manifest = cached["manifest"]
+            if cached.get("etag") == etag:
+                return manifest
+        else:
+            manifest = parse(response.content)
+        
+        try:
+            payload = _json_dumps({
+                "client": __version__,
+                "format": _MANIFEST_CACHE_FORMAT,
+                "manifest": manifest,
+                "etag": etag,
+                "sha256": content_hash
+            })
+            # Only cache manifests that survive the JSON round trip unchanged (no YAML dates, non-string keys, ...)
+            if _json_loads(payload)["manifest"] == manifest:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cache_file, 'wb') as f:
+                    f.write(payload)
             else:
-                cleaned_lines.append(line)
+                self.log_verbose(f"Manifest does not round-trip through JSON, not caching: {url}")
+        except (OSError, TypeError) as e:
+            self.log_verbose(f"Could not write manifest cache: {e}")
         
-        cleaned_json = '\n'.join(cleaned_lines)
-        return json.loads(cleaned_json)
+        return manifest
     
     def _fetch_package_metadata(self, repo_url: str, package_name: str) -> Tuple[dict, str]:
         """Fetch package metadata, trying YAML first, then JSONC"""
+        # Reuse metadata already fetched during this run
+        cache_key = (repo_url, package_name)
+        if cache_key in self._meta_cache:
+            self.log_verbose(f"Using cached metadata for {package_name}")
+            return self._meta_cache[cache_key]
+        
         # Try package.yaml first
         yaml_url = f"{repo_url}/packages/{package_name}/package.yaml"
         
         try:
-            response = self._fetch_with_progress(yaml_url, f"Fetching {package_name} metadata...")
-            yaml_data = yaml.safe_load(response.text)
-            return self._compile_paxd_manifest(yaml_data), "package.yaml"
+            manifest = self._fetch_manifest(yaml_url, package_name, lambda data: self._compile_paxd_manifest(_yaml_load(data)))
+            self._meta_cache[cache_key] = manifest, "package.yaml"
+            return self._meta_cache[cache_key]
         except Exception:
             pass
         
         # Try paxd.yaml
         yaml_url2 = f"{repo_url}/packages/{package_name}/paxd.yaml"
         try:
-            response = self._fetch_with_progress(yaml_url2, f"Fetching {package_name} metadata...")
-            yaml_data = yaml.safe_load(response.text)
-            return self._compile_paxd_manifest(yaml_data), "paxd.yaml"
+            manifest = self._fetch_manifest(yaml_url2, package_name, lambda data: self._compile_paxd_manifest(_yaml_load(data)))
+            self._meta_cache[cache_key] = manifest, "paxd.yaml"
+            return self._meta_cache[cache_key]
         except Exception:
             pass
         
         # Try legacy paxd JSONC
         package_url = f"{repo_url}/packages/{package_name}/paxd"
         try:
-            response = self._fetch_with_progress(package_url, f"Fetching {package_name} metadata...")
-            return self._parse_jsonc(response.text), "paxd"
+            manifest = self._fetch_manifest(package_url, package_name, self._parse_jsonc)
+            self._meta_cache[cache_key] = manifest, "paxd"
+            return self._meta_cache[cache_key]
         except Exception:
             pass
         
@@ -229,80 +328,130 @@ class PaxDImproved:
         
         return manifest
     
-    def _calculate_file_checksum(self, file_path: str, algorithm: str = "sha256") -> str:
-        """Calculate checksum for a file"""
-        hash_func = hashlib.new(algorithm)
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_func.update(chunk)
-        return hash_func.hexdigest()
-    
-    def _verify_checksum_with_retry(self, file_path: str, expected_checksum: str, max_retries: int = 6) -> bool:
-        """Verify file checksum with exponential backoff retry"""
-        algorithm, expected_hash = expected_checksum.split(':', 1)
-        
-        for attempt in range(max_retries):
-            try:
-                actual_hash = self._calculate_file_checksum(file_path, algorithm)
-                if actual_hash == expected_hash:
-                    self.log_verbose(f"Checksum verified for {os.path.basename(file_path)}: {expected_checksum}")
-                    return True
-                else:
-                    self.log_verbose(f"Checksum mismatch for {os.path.basename(file_path)}: expected {expected_hash}, got {actual_hash}")
-                    
-                    if attempt < max_retries - 1:
-                        wait_time = (2 ** attempt) * 0.5  # Exponential backoff: 0.5s, 1s, 2s, 4s, 8s, 16s
-                        console.print(f"[yellow]Checksum verification failed for {os.path.basename(file_path)}, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})[/yellow]")
-                        time.sleep(wait_time)
-                    else:
-                        console.print(f"[red]Checksum verification failed for {os.path.basename(file_path)} after {max_retries} attempts[/red]")
-                        return False
-                        
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * 0.5
-                    console.print(f"[yellow]Error calculating checksum for {os.path.basename(file_path)}: {e}, retrying in {wait_time}s...[/yellow]")
-                    time.sleep(wait_time)
-                else:
-                    console.print(f"[red]Failed to calculate checksum for {os.path.basename(file_path)}: {e}[/red]")
-                    return False
-        
-        return False
-    
-    def _download_and_verify_file(self, file_url: str, local_file_path: str, expected_checksum: Optional[str] = None, skip_checksum: bool = False) -> bool:
+    def _download_and_verify_file(self, file_url: str, local_file_path: str, expected_checksum: Optional[str] = None, skip_checksum: bool = False, max_retries: int = 3) -> bool:
         """Download file and verify checksum with atomic operation"""
         temp_file_path = local_file_path + ".tmp"
+        file_name = os.path.basename(local_file_path)
         
         try:
-            # Download to temporary file
-            response = requests.get(file_url, headers=self.headers)
-            response.raise_for_status()
-            
-            with open(temp_file_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Verify checksum if provided and not skipped
+            algorithm = expected_hash = None
             if expected_checksum and not skip_checksum:
-                if not self._verify_checksum_with_retry(temp_file_path, expected_checksum):
-                    # Remove temporary file on failure
-                    if os.path.exists(temp_file_path):
-                        os.remove(temp_file_path)
-                    return False
+                algorithm, expected_hash = expected_checksum.split(':', 1)
             
-            # Atomic move: rename temp file to final location
-            if os.path.exists(local_file_path):
-                os.remove(local_file_path)
-            os.rename(temp_file_path, local_file_path)
+            retry_reason = None
+            for attempt in range(max_retries):
+                download_url = file_url
+                if attempt > 0:
+                    wait_time = (2 ** attempt) * 0.5  # Exponential backoff: 1s, 2s
+                    console.print(f"[yellow]{retry_reason}, re-downloading in {wait_time}s... (attempt {attempt + 1}/{max_retries})[/yellow]")
+                    time.sleep(wait_time)
+                    if attempt == max_retries - 1:
+                        # Bypass any stale CDN cache on the final attempt
+                        download_url += f"?t={int(time.time())}"
+                
+                hash_func = hashlib.new(algorithm) if algorithm else None
+                
+                # Stream to temporary file, hashing the data as it arrives
+                try:
+                    with self.session.get(download_url, stream=True) as response:
+                        response.raise_for_status()
+                        with open(temp_file_path, 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=1 << 16):
+                                f.write(chunk)
+                                if hash_func:
+                                    hash_func.update(chunk)
+                except requests.exceptions.ChunkedEncodingError as e:
+                    # Connection errors are already retried by the session adapter, but it cannot resume a body cut off mid-stream
+                    if attempt == max_retries - 1:
+                        raise
+                    retry_reason = f"Download of {file_name} was interrupted ({e})"
+                    continue
+                
+                # Verify checksum if provided and not skipped
+                if not hash_func:
+                    break
+                
+                actual_hash = hash_func.hexdigest()
+                if actual_hash == expected_hash:
+                    self.log_verbose(f"Checksum verified for {file_name}: {expected_checksum}")
+                    break
+                
+                self.log_verbose(f"Checksum mismatch for {file_name}: expected {expected_hash}, got {actual_hash}")
+                retry_reason = f"Checksum verification failed for {file_name}"
+                os.remove(temp_file_path)
+            else:
+                console.print(f"[red]Checksum verification failed for {file_name} after {max_retries} attempts[/red]")
+                return False
+            
+            # Atomic move: replace final location with temp file
+            os.replace(temp_file_path, local_file_path)
             
             return True
             
         except Exception as e:
             # Clean up temp file on any error
-            if os.path.exists(temp_file_path):
+            try:
                 os.remove(temp_file_path)
-            console.print(f"[red]Failed to download {os.path.basename(local_file_path)}: {e}[/red]")
+            except FileNotFoundError:
+                pass
+            console.print(f"[red]Failed to download {file_name}: {e}[/red]")
             return False
     
+    def _download_files(self, repo_url: str, package_name: str, package_install_path: str, files: List[str], checksums: Dict[str, str], skip_checksum: bool, description: str) -> Tuple[List[str], Optional[str]]:
+        """Download package files concurrently with a progress bar, stopping at the first failure
+        
+        Returns the local paths that were written and the first file that failed (None if all succeeded)
+        """
+        written_files = []
+        failed_file = None
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=console
+        ) as progress:
+            file_task = progress.add_task(description, total=len(files))
+            
+            # Create each needed directory once rather than once per file
+            for directory in {os.path.dirname(os.path.join(package_install_path, file)) for file in files}:
+                os.makedirs(directory, exist_ok=True)
+            
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                futures = {}
+                for file in files:
+                    file_url = f"{repo_url}/packages/{package_name}/src/{file}"
+                    local_file_path = os.path.join(package_install_path, file)
+                    
+                    # Get expected checksum for this file
+                    expected_checksum = checksums.get(file)
+                    
+                    if expected_checksum and not skip_checksum:
+                        console.print(f"[dim]  Downloading and verifying {file}...[/dim]")
+                    else:
+                        console.print(f"[dim]  Downloading {file}...[/dim]")
+                    
+                    future = executor.submit(self._download_and_verify_file, file_url, local_file_path, expected_checksum, skip_checksum)
+                    futures[future] = (file, local_file_path)
+                
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    
+                    file, local_file_path = futures[future]
+                    if future.result():
+                        written_files.append(local_file_path)
+                        progress.advance(file_task)
+                    elif failed_file is None:
+                        failed_file = file
+                        # Don't start any downloads that are still queued (cancelled individually,
+                        # as executor.shutdown(cancel_futures=True) would leave as_completed waiting)
+                        for pending in futures:
+                            pending.cancel()
+        
+        return written_files, failed_file
+    
     def install(self, package_name: str, skip_checksum: bool = False):
         """Install a package with beautiful progress display"""
         # Block installation of original PaxD client
@@ -316,12 +465,7 @@ class PaxDImproved:
         
         try:
             # Read and resolve repository URL
-            repo_url = self._read_repository_url()
-            repo_url = self._resolve_repository_url(repo_url)
-            
-            # Validate repository
-            paxd_url = f"{repo_url}/paxd"
-            self._fetch_with_progress(paxd_url, "Validating repository...")
+            repo_url = self.repo_url
             
             # Check if already installed
             package_install_path = os.path.join(self.local_app_data, package_name)
@@ -356,16 +500,26 @@ class PaxDImproved:
             deps = package_data.get("install", {}).get("depend", [])
             if deps:
                 console.print(f"\n[bold blue]Installing {len(deps)} dependencies...[/bold blue]")
+                
+                # Group dependencies by kind, e.g. "pip:requests" -> deps_by_kind["pip"]
+                deps_by_kind: Dict[str, List[str]] = {"pip": [], "paxd": []}
                 for dep in deps:
-                    if dep.startswith("pip:"):
-                        pip_pkg = dep[4:]
-                        console.print(f"[dim]  Installing pip package: {pip_pkg}[/dim]")
-                        os.system(f"pip install {pip_pkg} -q")
-                    elif dep.startswith("paxd:"):
-                        paxd_pkg = dep[5:]
-                        if not self.is_installed(paxd_pkg):
-                            console.print(f"[dim]  Installing PaxD package: {paxd_pkg}[/dim]")
-                            self.install(paxd_pkg, skip_checksum)
+                    kind, _, name = dep.partition(":")
+                    if kind in deps_by_kind:
+                        deps_by_kind[kind].append(name)
+                
+                # Install all pip packages with a single pip invocation
+                pip_pkgs = deps_by_kind["pip"]
+                if pip_pkgs:
+                    console.print(f"[dim]  Installing pip packages: {', '.join(pip_pkgs)}[/dim]")
+                    result = subprocess.run([sys.executable, "-m", "pip", "install", "-q", *pip_pkgs], check=False)
+                    if result.returncode != 0:
+                        console.print(f"[yellow]pip exited with code {result.returncode}, some dependencies may not have been installed[/yellow]")
+                
+                for paxd_pkg in deps_by_kind["paxd"]:
+                    if not self.is_installed(paxd_pkg):
+                        console.print(f"[dim]  Installing PaxD package: {paxd_pkg}[/dim]")
+                        self.install(paxd_pkg, skip_checksum)
             
             # Install files with checksum verification
             include_files = package_data.get("install", {}).get("include", [])
@@ -375,57 +529,30 @@ class PaxDImproved:
                 console.print(f"\n[bold green]Installing {len(include_files)} files...[/bold green]")
                 
                 os.makedirs(package_install_path, exist_ok=True)
-                installed_files = []  # Track successfully installed files for rollback
+                installed_files, failed_file = self._download_files(repo_url, package_name, package_install_path, include_files, checksums, skip_checksum, "Installing files...")
                 
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    BarColumn(),
-                    TaskProgressColumn(),
-                    console=console
-                ) as progress:
-                    file_task = progress.add_task("Installing files...", total=len(include_files))
+                if failed_file is not None:
+                    # Checksum verification failed - rollback all installed files
+                    console.print(f"[red]Installation failed due to checksum verification failure for {failed_file}[/red]")
+                    console.print("[yellow]Rolling back installation...[/yellow]")
                     
-                    for file in include_files:
-                        file_url = f"{repo_url}/packages/{package_name}/src/{file}"
-                        local_file_path = os.path.join(package_install_path, file)
-                        
-                        # Create directories if needed
-                        os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-                        
-                        # Get expected checksum for this file
-                        expected_checksum = checksums.get(file)
-                        
-                        if expected_checksum and not skip_checksum:
-                            console.print(f"[dim]  Downloading and verifying {file}...[/dim]")
-                        else:
-                            console.print(f"[dim]  Downloading {file}...[/dim]")
-                        
-                        # Download and verify file
-                        if self._download_and_verify_file(file_url, local_file_path, expected_checksum, skip_checksum):
-                            installed_files.append(local_file_path)
-                            progress.advance(file_task)
-                        else:
-                            # Checksum verification failed - rollback all installed files
-                            console.print(f"[red]Installation failed due to checksum verification failure for {file}[/red]")
-                            console.print("[yellow]Rolling back installation...[/yellow]")
-                            
-                            for installed_file in installed_files:
-                                try:
-                                    if os.path.exists(installed_file):
-                                        os.remove(installed_file)
-                                except Exception as e:
-                                    self.log_verbose(f"Failed to remove {installed_file} during rollback: {e}")
-                            
-                            # Remove package directory if it was created
-                            try:
-                                if os.path.exists(package_install_path) and not os.listdir(package_install_path):
-                                    os.rmdir(package_install_path)
-                            except Exception as e:
-                                self.log_verbose(f"Failed to remove package directory during rollback: {e}")
-                            
-                            raise Exception(f"Checksum verification failed for {file}")
-                
+                    for installed_file in installed_files:
+                        try:
+                            os.remove(installed_file)
+                        except FileNotFoundError:
+                            pass
+                        except Exception as e:
+                            self.log_verbose(f"Failed to remove {installed_file} during rollback: {e}")
+                    
+                    # Remove package directory if it was created
+                    try:
+                        if os.path.exists(package_install_path) and not os.listdir(package_install_path):
+                            os.rmdir(package_install_path)
+                    except Exception as e:
+                        self.log_verbose(f"Failed to remove package directory during rollback: {e}")
+                    
+                    raise Exception(f"Checksum verification failed for {failed_file}")
+            
                 # If we get here, all files were successfully installed and verified
                 console.print(f"[green]All files installed and verified successfully[/green]")
             
@@ -442,9 +569,7 @@ class PaxDImproved:
                 
                 if not os.path.exists(bat_file_path):
                     self.log_verbose("Creating new batch file")
-                    with open(bat_file_path, 'w') as f:
-                        f.write("@echo off\n")
-                        f.write(f'"{sys.executable}" "{os.path.join(self.local_app_data, "com.mralfiem591.paxd", "run_pkg.py")}" "{os.path.join(package_install_path, mainfile)}" %*\n')
+                    _write_small_file(bat_file_path, f'{self._bat_prefix}"{os.path.join(package_install_path, mainfile)}" %*\r\n'.encode())
                     console.print(f"[green]Created batch file: {alias}.bat[/green]")
                 else:
                     console.print(f"[red]Batch file conflict detected for alias '{alias}'![/red]")
@@ -456,9 +581,7 @@ class PaxDImproved:
                     choice = Prompt.ask("Choose option", choices=["1", "2", "3"], default="2")
                     
                     if choice == "1":
-                        with open(bat_file_path, 'w') as f:
-                            f.write("@echo off\n")
-                            f.write(f'"{sys.executable}" "{os.path.join(self.local_app_data, "com.mralfiem591.paxd", "run_pkg.py")}" "{os.path.join(package_install_path, mainfile)}" %*\n')
+                        _write_small_file(bat_file_path, f'{self._bat_prefix}"{os.path.join(package_install_path, mainfile)}" %*\r\n'.encode())
                         console.print(f"[yellow]Replaced existing batch file for {alias}[/yellow]")
                     elif choice == "2":
                         console.print("[red]Installation cancelled due to batch file conflict[/red]")
@@ -469,15 +592,12 @@ class PaxDImproved:
                     elif choice == "3":
                         console.print("[yellow]Resolve the conflict manually, then press Enter to continue...[/yellow]")
                         input()
-                        with open(bat_file_path, 'w') as f:
-                            f.write("@echo off\n")
-                            f.write(f'"{sys.executable}" "{os.path.join(self.local_app_data, "com.mralfiem591.paxd", "run_pkg.py")}" "{os.path.join(package_install_path, mainfile)}" %*\n')
+                        _write_small_file(bat_file_path, f'{self._bat_prefix}"{os.path.join(package_install_path, mainfile)}" %*\r\n'.encode())
                         console.print(f"[green]Created batch file after manual resolution[/green]")
             
             # Save version info
             version_file = os.path.join(package_install_path, ".VERSION")
-            with open(version_file, 'w') as f:
-                f.write(pkg_info.get('pkg_version', 'Unknown'))
+            _write_small_file(version_file, pkg_info.get('pkg_version', 'Unknown').encode())
             
             # Mark as user installed
             user_file = os.path.join(package_install_path, ".USER_INSTALLED")
@@ -506,9 +626,9 @@ class PaxDImproved:
             return
         
         # Get package info if available
+        package_data = None
         try:
-            repo_url = self._read_repository_url()
-            repo_url = self._resolve_repository_url(repo_url)
+            repo_url = self.repo_url
             package_data, _ = self._fetch_package_metadata(repo_url, package_name)
             pkg_info = package_data.get('pkg_info', {})
             display_name = pkg_info.get('pkg_name', package_name)
@@ -521,18 +641,19 @@ class PaxDImproved:
 
         console.print(f"\n[bold red]Uninstalling {display_name}...[/bold red]")
         
-        # Get package metadata for bat file cleanup
+        # Use the package metadata fetched above for bat file cleanup
         try:
-            package_data, _ = self._fetch_package_metadata(repo_url, package_name)
-            mainfile = package_data.get("install", {}).get("mainfile")
+            mainfile = (package_data or {}).get("install", {}).get("mainfile")
             if mainfile:
                 alias = package_data.get("install", {}).get("alias", mainfile.split(".")[0])
                 # Remove bat file from original PaxD's bin directory
                 original_paxd_bin = os.path.join(self.local_app_data, "com.mralfiem591.paxd", "bin")
                 bat_file_path = os.path.join(original_paxd_bin, f"{alias}.bat")
-                if os.path.exists(bat_file_path):
+                try:
                     os.remove(bat_file_path)
                     console.print(f"[yellow]Removed batch file: {alias}.bat[/yellow]")
+                except FileNotFoundError:
+                    pass
         except Exception as e:
             self.log_verbose(f"Could not clean up bat file: {e}")
         
@@ -544,6 +665,14 @@ class PaxDImproved:
         except Exception as e:
             console.print(f"[red]Uninstallation failed: {e}[/red]")
     
+    def _restore_backup(self, backup_dir: str, package_install_path: str):
+        """Remove a partially updated package and move its backup back into place"""
+        try:
+            shutil.rmtree(package_install_path)
+        except FileNotFoundError:
+            pass
+        os.replace(backup_dir, package_install_path)
+    
     def update(self, package_name: str, force: bool = False, skip_checksum: bool = False):
         """Update a package to the latest version"""
         # Block updates of original PaxD client
@@ -563,14 +692,14 @@ class PaxDImproved:
         try:
             # Get current version
             version_file = os.path.join(package_install_path, ".VERSION")
-            current_version = "Unknown"
-            if os.path.exists(version_file):
+            try:
                 with open(version_file, 'r') as f:
                     current_version = f.read().strip()
+            except FileNotFoundError:
+                current_version = "Unknown"
             
             # Fetch latest metadata
-            repo_url = self._read_repository_url()
-            repo_url = self._resolve_repository_url(repo_url)
+            repo_url = self.repo_url
             package_data, _ = self._fetch_package_metadata(repo_url, package_name)
             
             pkg_info = package_data.get('pkg_info', {})
@@ -595,72 +724,50 @@ class PaxDImproved:
             # Atomic update with backup and restore
             backup_dir = None
             try:
+                # Get files and checksums for new version
+                include_files = package_data.get("install", {}).get("include", [])
+                checksums = package_data.get("install", {}).get("checksum", {})
+                
                 # Create backup directory
                 backup_dir = package_install_path + ".backup"
-                if os.path.exists(backup_dir):
+                try:
                     shutil.rmtree(backup_dir)
-                shutil.copytree(package_install_path, backup_dir)
-                self.log_verbose(f"Created backup at: {backup_dir}")
+                except FileNotFoundError:
+                    pass
                 
-                # Get files and checksums for new version
-                include_files = package_data.get("install", {}).get("include", [])
-                checksums = package_data.get("install", {}).get("checksum", {})
+                try:
+                    # Move the current install aside, which is a cheap rename on the same volume
+                    os.rename(package_install_path, backup_dir)
+                except OSError:
+                    # Rename not possible (e.g. cross-device), fall back to a full copy
+                    shutil.copytree(package_install_path, backup_dir)
+                else:
+                    # Carry over only what the new version won't replace (markers, user data)
+                    replaced = {os.path.normpath(file) for file in include_files}
+                    def ignore_replaced(directory, names):
+                        return [name for name in names if os.path.normpath(os.path.relpath(os.path.join(directory, name), backup_dir)) in replaced]
+                    shutil.copytree(backup_dir, package_install_path, ignore=ignore_replaced)
+                self.log_verbose(f"Created backup at: {backup_dir}")
                 
                 if include_files:
                     console.print(f"[bold blue]Updating {len(include_files)} files...[/bold blue]")
                     
-                    updated_files = []  # Track updated files for rollback
+                    _, failed_file = self._download_files(repo_url, package_name, package_install_path, include_files, checksums, skip_checksum, "Updating files...")
                     
-                    with Progress(
-                        SpinnerColumn(),
-                        TextColumn("[progress.description]{task.description}"),
-                        BarColumn(),
-                        TaskProgressColumn(),
-                        console=console
-                    ) as progress:
-                        file_task = progress.add_task("Updating files...", total=len(include_files))
+                    if failed_file is not None:
+                        # Update failed - restore from backup
+                        console.print(f"[red]Update failed due to checksum verification failure for {failed_file}[/red]")
+                        console.print("[yellow]Restoring from backup...[/yellow]")
                         
-                        for file in include_files:
-                            file_url = f"{repo_url}/packages/{package_name}/src/{file}"
-                            local_file_path = os.path.join(package_install_path, file)
-                            
-                            # Create directories if needed
-                            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-                            
-                            # Get expected checksum for this file
-                            expected_checksum = checksums.get(file)
-                            
-                            if expected_checksum and not skip_checksum:
-                                console.print(f"[dim]  Downloading and verifying {file}...[/dim]")
-                            else:
-                                console.print(f"[dim]  Downloading {file}...[/dim]")
-                            
-                            # Download and verify file
-                            if self._download_and_verify_file(file_url, local_file_path, expected_checksum, skip_checksum):
-                                updated_files.append(local_file_path)
-                                progress.advance(file_task)
-                            else:
-                                # Update failed - restore from backup
-                                console.print(f"[red]Update failed due to checksum verification failure for {file}[/red]")
-                                console.print("[yellow]Restoring from backup...[/yellow]")
-                                
-                                # Remove package directory and restore from backup
-                                if os.path.exists(package_install_path):
-                                    shutil.rmtree(package_install_path)
-                                shutil.copytree(backup_dir, package_install_path)
-                                
-                                # Clean up backup
-                                if os.path.exists(backup_dir):
-                                    shutil.rmtree(backup_dir)
-                                
-                                raise Exception(f"Update failed: checksum verification failed for {file}")
+                        self._restore_backup(backup_dir, package_install_path)
+                        
+                        raise Exception(f"Update failed: checksum verification failed for {failed_file}")
                     
                     console.print(f"[green]All files updated and verified successfully[/green]")
                     
                     # Update version file
                     version_file = os.path.join(package_install_path, ".VERSION")
-                    with open(version_file, 'w') as f:
-                        f.write(latest_version)
+                    _write_small_file(version_file, latest_version.encode())
                     
                     # Update bat file if mainfile exists
                     mainfile = package_data.get("install", {}).get("mainfile")
@@ -671,9 +778,7 @@ class PaxDImproved:
                         os.makedirs(original_paxd_bin, exist_ok=True)
                         bat_file_path = os.path.join(original_paxd_bin, f"{alias}.bat")
                         
-                        with open(bat_file_path, 'w') as f:
-                            f.write("@echo off\n")
-                            f.write(f'"{sys.executable}" "{os.path.join(self.local_app_data, "com.mralfiem591.paxd", "run_pkg.py")}" "{os.path.join(package_install_path, mainfile)}" %*\n')
+                        _write_small_file(bat_file_path, f'{self._bat_prefix}"{os.path.join(package_install_path, mainfile)}" %*\r\n'.encode())
                         console.print(f"[green]Updated batch file: {alias}.bat[/green]")
                     
                     # Clean up backup on success
@@ -684,35 +789,43 @@ class PaxDImproved:
                     console.print(f"[bold green]Successfully updated {display_name} to version {latest_version}[/bold green]")
                 
             except Exception as update_error:
-                # Ensure backup is cleaned up even on error
+                # The install directory may be incomplete, so restore the backup if it is still there
                 if backup_dir and os.path.exists(backup_dir):
                     try:
-                        shutil.rmtree(backup_dir)
-                    except Exception as cleanup_error:
-                        self.log_verbose(f"Failed to clean up backup: {cleanup_error}")
+                        self._restore_backup(backup_dir, package_install_path)
+                    except Exception as restore_error:
+                        self.log_verbose(f"Failed to restore backup: {restore_error}")
                 raise update_error
             
         except Exception as e:
             console.print(f"[red]Update failed: {e}[/red]")
     
+    def _read_pkg_meta(self, entry: os.DirEntry) -> Tuple[str, str, bool]:
+        """Read the installed version and user-installed flag for a package directory"""
+        try:
+            with open(os.path.join(entry.path, ".VERSION"), 'r') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            version = "Unknown"
+        
+        user_installed = os.path.exists(os.path.join(entry.path, ".USER_INSTALLED"))
+        return entry.name, version, user_installed
+    
     def list_installed(self):
         """List all installed packages in a beautiful table"""
         if not os.path.exists(self.local_app_data):
             console.print("[yellow]No packages installed yet[/yellow]")
             return
         
-        packages = []
-        for item in os.listdir(self.local_app_data):
-            item_path = os.path.join(self.local_app_data, item)
-            if os.path.isdir(item_path):
-                version_file = os.path.join(item_path, ".VERSION")
-                version = "Unknown"
-                if os.path.exists(version_file):
-                    with open(version_file, 'r') as f:
-                        version = f.read().strip()
-                
-                user_installed = os.path.exists(os.path.join(item_path, ".USER_INSTALLED"))
-                packages.append((item, version, user_installed))
+        with os.scandir(self.local_app_data) as entries:
+            package_entries = [entry for entry in entries if entry.is_dir()]
+        
+        # Read package metadata files in parallel, unless there are only a few
+        if len(package_entries) < 4:
+            packages = [self._read_pkg_meta(entry) for entry in package_entries]
+        else:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                packages = list(executor.map(self._read_pkg_meta, package_entries))
         
         if not packages:
             console.print("[yellow]No packages installed yet[/yellow]")
@@ -736,31 +849,37 @@ class PaxDImproved:
         console.print(f"\n[bold cyan]Searching for: [yellow]{search_term}[/yellow][/bold cyan]")
         
         try:
-            repo_url = self._read_repository_url()
-            repo_url = self._resolve_repository_url(repo_url)
+            repo_url = self.repo_url
             
             # Fetch search index
             search_url = f"{repo_url}/searchindex.csv"
-            response = self._fetch_with_progress(search_url, "Searching packages...")
+            response = self._fetch_with_progress(search_url, "Searching packages...", stream=True)
             
             results = []
-            lines = response.text.strip().split('\n')
+            search_lower = search_term.casefold()
+            search_bytes = search_lower.encode() if search_lower.isascii() else None
             
-            for line in lines[1:]:  # Skip header
-                if not line.strip():
-                    continue
+            def line_matches(raw_line: bytes) -> bool:
+                # For pure-ASCII rows casefold() is plain ASCII lowercasing, so match on the raw bytes
+                if raw_line.isascii():
+                    return search_bytes is not None and search_bytes in raw_line.translate(_ASCII_LOWER)
+                return search_lower in raw_line.decode('utf-8').casefold()
+            
+            # Parse the index row by row as it streams in
+            with response:
+                raw_lines = response.iter_lines()
+                header = next(csv.reader([next(raw_lines, b'').decode('utf-8')]), [])
                 
-                parts = line.split(',', 4)  # Split into max 5 parts
-                if len(parts) >= 5:
-                    pkg_id, name, author, version, description = parts
+                # Scan each raw row once and only decode and parse rows that contain the term somewhere
+                matching_lines = (raw_line.decode('utf-8') for raw_line in raw_lines if line_matches(raw_line))
+                
+                for row in csv.DictReader(matching_lines, fieldnames=header):
+                    pkg_id, name, author, version, description = (
+                        row.get(field) or '' for field in ('package_id', 'package_name', 'author', 'version', 'description')
+                    )
                     
                     # Simple search matching
-                    search_lower = search_term.lower()
-                    if (search_lower in name.lower() or 
-                        search_lower in pkg_id.lower() or 
-                        search_lower in description.lower() or
-                        search_lower in author.lower()):
-                        
+                    if any(search_lower in field.casefold() for field in (name, pkg_id, description, author) if field):
                         results.append({
                             'id': pkg_id,
                             'name': name,
@@ -768,6 +887,10 @@ class PaxDImproved:
                             'version': version,
                             'description': description
                         })
+                        
+                        # One result past the limit is enough to know the list was truncated
+                        if limit and len(results) > limit:
+                            break
             
             if not results:
                 console.print("[yellow]No packages found matching your search[/yellow]")
@@ -806,57 +929,57 @@ class PaxDImproved:
         console.print(f"\n[bold cyan]Package Information: [yellow]{package_name}[/yellow][/bold cyan]")
         
         try:
-            repo_url = self._read_repository_url()
-            repo_url = self._resolve_repository_url(repo_url)
+            repo_url = self.repo_url
             package_data, source = self._fetch_package_metadata(repo_url, package_name)
             
             pkg_info = package_data.get('pkg_info', {})
             install_info = package_data.get('install', {})
             
-            # Check if installed
+            # Check if installed, only stat the package directory when there is no .VERSION to read
             package_install_path = os.path.join(self.local_app_data, package_name)
-            is_installed = os.path.exists(package_install_path)
-            
             installed_version = None
-            if is_installed:
-                version_file = os.path.join(package_install_path, ".VERSION")
-                if os.path.exists(version_file):
-                    with open(version_file, 'r') as f:
-                        installed_version = f.read().strip()
-            
-            # Create info panel
-            info_text = f"""[bold]Name:[/bold] {pkg_info.get('pkg_name', 'Unknown')}
-[bold]ID:[/bold] {package_name}
-[bold]Author:[/bold] {pkg_info.get('pkg_author', 'Unknown')}
-[bold]Version:[/bold] {pkg_info.get('pkg_version', 'Unknown')}
-[bold]License:[/bold] {pkg_info.get('pkg_license', 'Unknown')}
-[bold]Description:[/bold] {pkg_info.get('pkg_description', 'No description available')}
-
-[bold]Installation Status:[/bold]"""
+            try:
+                with open(os.path.join(package_install_path, ".VERSION"), 'r') as f:
+                    installed_version = f.read().strip()
+                is_installed = True
+            except FileNotFoundError:
+                is_installed = os.path.exists(package_install_path)
             
             if is_installed:
                 status_color = "green" if installed_version == pkg_info.get('pkg_version') else "yellow"
-                info_text += f" [{status_color}]Installed (v{installed_version or 'Unknown'})[/{status_color}]"
+                install_status = f"[{status_color}]Installed (v{installed_version or 'Unknown'})[/{status_color}]"
             else:
-                info_text += " [red]Not installed[/red]"
+                install_status = "[red]Not installed[/red]"
+            
+            # Create info panel
+            parts = [
+                f"[bold]Name:[/bold] {pkg_info.get('pkg_name', 'Unknown')}",
+                f"[bold]ID:[/bold] {package_name}",
+                f"[bold]Author:[/bold] {pkg_info.get('pkg_author', 'Unknown')}",
+                f"[bold]Version:[/bold] {pkg_info.get('pkg_version', 'Unknown')}",
+                f"[bold]License:[/bold] {pkg_info.get('pkg_license', 'Unknown')}",
+                f"[bold]Description:[/bold] {pkg_info.get('pkg_description', 'No description available')}",
+                "",
+                f"[bold]Installation Status:[/bold] {install_status}"
+            ]
             
             # Dependencies
             deps = install_info.get('depend', [])
             if deps:
-                info_text += f"\n\n[bold]Dependencies:[/bold] {len(deps)}"
-                for dep in deps[:5]:  # Show first 5
-                    info_text += f"\n  • {dep}"
+                parts.extend(["", f"[bold]Dependencies:[/bold] {len(deps)}"])
+                parts.extend(f"  • {dep}" for dep in deps[:5])  # Show first 5
                 if len(deps) > 5:
-                    info_text += f"\n  ... and {len(deps) - 5} more"
+                    parts.append(f"  ... and {len(deps) - 5} more")
             
             # Files
             files = install_info.get('include', [])
             if files:
-                info_text += f"\n\n[bold]Files included:[/bold] {len(files)}"
-                for file in files[:5]:  # Show first 5
-                    info_text += f"\n  • {file}"
+                parts.extend(["", f"[bold]Files included:[/bold] {len(files)}"])
+                parts.extend(f"  • {file}" for file in files[:5])  # Show first 5
                 if len(files) > 5:
-                    info_text += f"\n  ... and {len(files) - 5} more"
+                    parts.append(f"  ... and {len(files) - 5} more")
+            
+            info_text = "\n".join(parts)
             
             package_panel = Panel(
                 info_text,
@@ -884,8 +1007,7 @@ class PaxDImproved:
         
         # Show repository info
         try:
-            repo_url = self._read_repository_url()
-            repo_url = self._resolve_repository_url(repo_url)
+            repo_url = self.repo_url
             console.print(f"[green]Repository configured: [cyan]{repo_url}[/cyan][/green]")
         except:
             console.print("[red]Repository not configured properly[/red]")
@@ -985,6 +1107,8 @@ def create_argument_parser():
 
 def main():
     """Main entry point"""
+    console.print(f"[bold red]CRITICAL WARNING:[/bold red] [yellow]PaxD Improved is a BETA version of PaxD, which will eventually become the default client. [bold yellow]A LOT OF STUFF IS BROKEN! DO NOT EXPECT STABILITY![/bold yellow][/yellow]\n\n[blue]You can switch back to the default client via [cyan]paxd switchback[/cyan][blue] if you encounter issues.[/blue]\n[green]Please report any bugs you find!\n\nYou may continue after 5 seconds.[/green]")
+    time.sleep(5)
 
     parser = create_argument_parser()
     args = parser.parse_args()
@@ -1039,4 +1163,5 @@ def main():
             import traceback
             console.print(f"[dim]{traceback.format_exc()}[/dim]")
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()